@@ -5,74 +5,170 @@ Pytest 配置文件
 """
 
 import asyncio
+import copy
 import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import AsyncIterator, Iterator
-from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
+from typing import AsyncIterator, Iterator, Protocol
 
 import pytest
-import redis.asyncio as aioredis
-from httpx import AsyncClient, ASGITransport
 
+# 重量级依赖（redis、httpx 等）推迟到具体 fixture 内导入，
+# 避免只跑单元测试时也要承担整个导入成本
 # 添加项目根目录到 Python 路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
+# 不再覆盖 event_loop：使用 pytest-asyncio 内置的函数级事件循环，
+# 避免 session 级循环与函数级异步 fixture 之间的作用域死锁
+
+
 @pytest.fixture(scope="session")
-def event_loop():
-    """创建事件循环"""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+def event_loop_policy():
+    """优先用 uvloop 跑测试事件循环
+
+    每个异步测试都要建立/销毁一次事件循环，uvloop 的创建和收尾都明显
+    更快。未安装时（如 Windows 本地开发）回退到标准 asyncio 实现。
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+
+    return uvloop.EventLoopPolicy()
+
+
+def _worker_redis_url(redis_url: str) -> str:
+    """为每个 pytest-xdist worker 分配独立的 Redis DB
+
+    并行跑真实 Redis 时，所有 worker 共用一个 DB 会让 flushdb 互相清掉
+    对方的数据。gw0 沿用 URL 里配置的 DB，gwN 依次向下取号；号用尽时
+    直接失败——绝不回绕到别的 worker 的 DB，也绝不落到会被 flushdb
+    清空的 DB 0 以下。
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "")
+    if not worker.startswith("gw"):
+        return redis_url
+
+    from urllib.parse import urlsplit, urlunsplit
+
+    parts = urlsplit(redis_url)
+    base_db = int(parts.path.lstrip("/") or 0)
+    worker_num = int(worker[2:])
+    if worker_num > base_db:
+        pytest.fail(
+            f"xdist worker {worker} 无独立 Redis DB 可用："
+            f"TEST_REDIS_URL 的 DB {base_db} 只够 {base_db + 1} 个 worker，"
+            f"请降低 -n 并发数或调高 URL 里的 DB 号"
+        )
+    return urlunsplit(parts._replace(path=f"/{base_db - worker_num}"))
 
 
 @pytest.fixture
-async def redis_client() -> AsyncIterator[aioredis.Redis]:
-    """创建 Redis 客户端"""
-    redis_url = os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15")
+async def redis_client() -> AsyncIterator:
+    """创建 Redis 客户端
+
+    默认使用 fakeredis 的内存实现，测试不依赖本地 Redis 服务；
+    设置 TEST_REDIS_URL 时才连接真实 Redis（集成验证用）。
+    """
+    redis_url = os.environ.get("TEST_REDIS_URL")
+
+    if redis_url:
+        import redis.asyncio as aioredis
+
+        client = await aioredis.from_url(
+            _worker_redis_url(redis_url), decode_responses=True
+        )
+    else:
+        import fakeredis.aioredis
 
-    client = await aioredis.from_url(redis_url, decode_responses=True)
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
 
-    # 测试前清空数据库
-    await client.flushdb()
+    # 测试前清空一次数据库即可：asynchronous=True 走服务端 lazy-free
+    # （与 UNLINK 同一机制），不阻塞等待大 key 释放；测试后不再重复
+    # flush，下一个 fixture 实例化时自然会清理
+    await client.flushdb(asynchronous=True)
 
     yield client
 
-    # 测试后清理
-    await client.flushdb()
     await client.close()
 
 
+class MockRedisClient:
+    """轻量手写 Redis 替身
+
+    blackboard/publisher 的调用路径很热，AsyncMock 每次调用都要走动态
+    属性解析并记录调用历史，这里用带内存字典的普通类替代。
+    """
+
+    def __init__(self):
+        self.store: dict = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, *args, **kwargs):
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self.store.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    async def keys(self, pattern="*"):
+        return list(self.store)
+
+    async def exists(self, *keys):
+        return sum(1 for key in keys if key in self.store)
+
+    async def flushdb(self):
+        self.store.clear()
+        return True
+
+    async def ping(self):
+        return True
+
+
 @pytest.fixture
 async def mock_redis():
     """Mock Redis 客户端"""
-    mock = AsyncMock()
-    mock.get = AsyncMock(return_value=None)
-    mock.set = AsyncMock()
-    mock.delete = AsyncMock()
-    mock.keys = AsyncMock(return_value=[])
-    mock.exists = AsyncMock(return_value=False)
-    mock.flushdb = AsyncMock()
-    mock.ping = AsyncMock(return_value=True)
-    return mock
+    return MockRedisClient()
+
+
+def _async_return(value=None):
+    """返回固定值的 async 函数，替代 AsyncMock(return_value=...)"""
+    async def _call(*args, **kwargs):
+        return value
+
+    return _call
 
 
 @pytest.fixture
 def mock_llm_client():
     """Mock LLM 客户端"""
-    mock = AsyncMock()
-    mock.complete = AsyncMock(return_value="Mock LLM response")
-    mock.complete_with_tools = AsyncMock(return_value="Mock response")
-    mock.stream_complete = AsyncMock(return_value=iter(["Mock", " stream"]))
-    mock.close = AsyncMock()
-    return mock
+    def _stream_complete(*args, **kwargs):
+        # 同步生成器工厂：每次调用返回新的迭代器，避免协程分配，
+        # 也避免共享 iter() 第二次调用时已被耗尽的问题
+        yield "Mock"
+        yield " stream"
+
+    return SimpleNamespace(
+        complete=_async_return("Mock LLM response"),
+        complete_with_tools=_async_return("Mock response"),
+        stream_complete=_stream_complete,
+        close=_async_return(),
+    )
 
 
-@pytest.fixture
-def mock_settings():
-    """Mock 配置"""
+@pytest.fixture(scope="session")
+def _mock_settings_template():
+    """Mock 配置模板（session 级，只构建一次）"""
     from nexus.config.settings import (
         Settings, OrchestratorConfig, ClusterConfig,
         AgentsConfig, APIConfig, MonitoringConfig, SecurityConfig
@@ -120,14 +216,22 @@ def mock_settings():
 
 
 @pytest.fixture
-async def app_client(mock_settings):
+def mock_settings(_mock_settings_template):
+    """Mock 配置（每个测试拿到独立的深拷贝）"""
+    return copy.deepcopy(_mock_settings_template)
+
+
+@pytest.fixture
+async def app_client(mock_settings, monkeypatch):
     """创建 FastAPI 测试客户端"""
-    from nexus.api.main import app
-    from nexus.config.settings import get_settings
+    from httpx import ASGITransport, AsyncClient
 
-    # 使用 mock settings
     import nexus.config.settings
-    nexus.config.settings._settings = mock_settings
+    from nexus.api.main import app
+
+    # 使用 mock settings；monkeypatch 在测试结束后自动还原全局单例，
+    # 避免直接赋值把 mock 泄漏到后续测试
+    monkeypatch.setattr(nexus.config.settings, "_settings", mock_settings)
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -148,9 +252,9 @@ async def blackboard_state():
     return state
 
 
-@pytest.fixture
-def sample_task():
-    """创建测试任务"""
+@pytest.fixture(scope="session")
+def _sample_task_template():
+    """测试任务模板（session 级，只构建一次）"""
     from nexus.orchestrator.models import Task, TaskType, TaskStatus
 
     task = Task(
@@ -164,6 +268,12 @@ def sample_task():
     return task
 
 
+@pytest.fixture
+def sample_task(_sample_task_template):
+    """创建测试任务（每个测试拿到独立的深拷贝）"""
+    return copy.deepcopy(_sample_task_template)
+
+
 @pytest.fixture
 def sample_dag(sample_task):
     """创建测试 DAG"""
@@ -174,37 +284,72 @@ def sample_dag(sample_task):
     return dag
 
 
+class BlackboardProtocol(Protocol):
+    """Orchestrator 依赖的 Blackboard 结构契约
+
+    只描述测试路径用到的属性，替代导入真实 Blackboard 再走 __new__
+    绕过 __init__ 的做法。
+    """
+
+    redis: object
+    publisher: object
+
+    async def _get_client(self): ...
+
+
+@dataclass
+class MockBlackboard:
+    """测试用 Blackboard 替身，满足 BlackboardProtocol"""
+
+    redis: MockRedisClient
+    publisher: MockRedisClient
+
+    async def _get_client(self):
+        return self.redis
+
+
+@dataclass
+class MockOrchestrator:
+    """测试用 Orchestrator 替身
+
+    字段与真实 Orchestrator 对齐，但跳过 __init__ 中的连接和加载逻辑，
+    替代脆弱的 Orchestrator.__new__ + 手动属性赋值。
+    """
+
+    llm_client: object
+    blackboard: BlackboardProtocol
+    agent_factory: object
+    skill_manager: object
+    intent_parser: object
+    dag_builder: object
+    scheduler: object
+    monitor: object
+    _initialized: bool = True
+
+
 @pytest.fixture
 async def mock_orchestrator(mock_llm_client, mock_redis):
     """创建 Mock Orchestrator"""
-    from nexus.orchestrator.orchestrator import Orchestrator
-    from nexus.state.blackboard import Blackboard
-
-    # 创建 mock blackboard
-    blackboard = Blackboard.__new__(Blackboard)
-    blackboard.redis = mock_redis
-    blackboard.publisher = mock_redis
-    blackboard._get_client = AsyncMock(return_value=mock_redis)
-
-    # 创建 orchestrator
-    orchestrator = Orchestrator.__new__(Orchestrator)
-    orchestrator.llm_client = mock_llm_client
-    orchestrator.blackboard = blackboard
-    orchestrator.agent_factory = AsyncMock()
-    orchestrator.skill_manager = MagicMock()
-    orchestrator.intent_parser = AsyncMock()
-    orchestrator.dag_builder = MagicMock()
-    orchestrator.scheduler = AsyncMock()
-    orchestrator.monitor = MagicMock()
-    orchestrator._initialized = True
-
-    return orchestrator
+    blackboard = MockBlackboard(redis=mock_redis, publisher=mock_redis)
+
+    # 协作者只需占位：SimpleNamespace 没有 mock 的动态属性开销，
+    # 测试需要具体行为时再在用例里按需补充属性
+    return MockOrchestrator(
+        llm_client=mock_llm_client,
+        blackboard=blackboard,
+        agent_factory=SimpleNamespace(),
+        skill_manager=SimpleNamespace(),
+        intent_parser=SimpleNamespace(),
+        dag_builder=SimpleNamespace(),
+        scheduler=SimpleNamespace(),
+        monitor=SimpleNamespace(),
+    )
 
 
 # 测试数据 fixtures
-@pytest.fixture
-def sample_intent():
-    """示例用户意图"""
+@pytest.fixture(scope="session")
+def _sample_intent_template():
+    """示例用户意图模板"""
     return {
         "user_input": "创建一个 Flask REST API",
         "context": {}
@@ -212,8 +357,14 @@ def sample_intent():
 
 
 @pytest.fixture
-def sample_execution_plan():
-    """示例执行计划"""
+def sample_intent(_sample_intent_template):
+    """示例用户意图（每个测试拿到独立的深拷贝）"""
+    return copy.deepcopy(_sample_intent_template)
+
+
+@pytest.fixture(scope="session")
+def _sample_execution_plan_template():
+    """示例执行计划模板"""
     return {
         "steps": [
             {
@@ -236,6 +387,12 @@ def sample_execution_plan():
     }
 
 
+@pytest.fixture
+def sample_execution_plan(_sample_execution_plan_template):
+    """示例执行计划（每个测试拿到独立的深拷贝）"""
+    return copy.deepcopy(_sample_execution_plan_template)
+
+
 # 异步测试辅助工具
 class AsyncTestRunner:
     """异步测试运行器"""
@@ -252,6 +409,20 @@ def async_runner():
     return AsyncTestRunner()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _warm_up_skill_imports():
+    """session 级预热：nexus.skills 各模块只导入一次
+
+    技能模块的导入成本集中在首个用到它的测试上，会让该测试在计时里
+    显得异常慢；这里统一在 session 开始时导入，之后全部命中 sys.modules。
+    """
+    import nexus.skills.base
+    import nexus.skills.builtin.file_ops
+    import nexus.skills.builtin.terminal
+    import nexus.skills.manager
+    import nexus.skills.registry
+
+
 # 跳过集成测试的标记
 def pytest_configure(config):
     """Pytest 配置"""
@@ -266,20 +437,36 @@ def pytest_configure(config):
     )
 
 
+# Redis 可用性探测结果缓存（None 表示尚未探测）
+_redis_available: bool | None = None
+
+
+def _probe_redis_available(redis_url: str) -> bool:
+    """探测 TEST_REDIS_URL 指向的 Redis 是否可用，结果缓存在模块级变量中"""
+    global _redis_available
+
+    if _redis_available is None:
+        try:
+            import redis
+            r = redis.Redis.from_url(redis_url, socket_connect_timeout=0.2)
+            r.ping()
+            r.close()
+            _redis_available = True
+        except Exception:
+            _redis_available = False
+
+    return _redis_available
+
+
 # 在测试前检查 Redis 是否可用
 def pytest_collection_modifyitems(config, items):
     """修改测试收集"""
-    redis_available = True
+    # 未设置 TEST_REDIS_URL 时走 fakeredis，无需真实 Redis，也就无需跳过
+    redis_url = os.environ.get("TEST_REDIS_URL")
+    if not redis_url:
+        return
 
-    try:
-        import redis
-        r = redis.Redis(host="localhost", port=6379, db=15, socket_connect_timeout=1)
-        r.ping()
-        r.close()
-    except Exception:
-        redis_available = False
-
-    if not redis_available:
+    if not _probe_redis_available(redis_url):
         skip_redis = pytest.mark.skip(reason="Redis not available")
         for item in items:
             if "redis" in item.fixturenames or "blackboard" in item.fixturenames:
@@ -4,46 +4,72 @@ API 集成测试
 测试 FastAPI 端点的集成功能
 """
 
+import asyncio
+
+import orjson
 import pytest
 from httpx import AsyncClient, ASGITransport
 from nexus.api.main import create_app
 
+# 请求体在模块加载时用 orjson 序列化一次，测试内直接发送原始字节，
+# 免去每次调用时 httpx 内置 json 编码的开销
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_SUBMIT_TASK_PAYLOAD = orjson.dumps({
+    "user_input": "创建一个 Hello World API",
+    "priority": 5,
+})
+
+
+@pytest.fixture(scope="session")
+def app():
+    """所有集成测试类共享的 FastAPI 应用实例
+
+    create_app() 会装配全部路由和中间件，每个类重建一次纯属浪费。
+    """
+    return create_app()
+
+
+@pytest.fixture(scope="class")
+async def client(app):
+    """类级共享的测试客户端
+
+    原来四个类各自定义了相同的 client fixture，每个测试都会重开一次
+    AsyncClient。统一成一个类级 fixture，同一个类内的测试复用连接。
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as ac:
+        yield ac
+
 
 @pytest.mark.integration
 class TestHealthEndpoints:
     """健康检查端点测试"""
 
-    @pytest.fixture
-    async def client(self):
-        """创建测试客户端"""
-        app = create_app()
-        async with AsyncClient(
-            transport=ASGITransport(app=app),
-            base_url="http://test"
-        ) as ac:
-            yield ac
-
-    async def test_health_check(self, client):
-        """测试基本健康检查"""
-        response = await client.get("/health/")
-        assert response.status_code == 200
-        data = response.json()
+    async def test_health_endpoints(self, client):
+        """测试健康检查端点（三个只读请求并发发出）"""
+        basic, detailed, metrics = await asyncio.gather(
+            client.get("/health/"),
+            client.get("/health/detailed"),
+            client.get("/health/metrics"),
+        )
+
+        # 基本健康检查
+        assert basic.status_code == 200
+        data = basic.json()
         assert "status" in data
         assert "version" in data
 
-    async def test_detailed_status(self, client):
-        """测试详细状态"""
-        response = await client.get("/health/detailed")
-        assert response.status_code == 200
-        data = response.json()
+        # 详细状态
+        assert detailed.status_code == 200
+        data = detailed.json()
         assert "overall_status" in data
         assert "components" in data
 
-    async def test_metrics_endpoint(self, client):
-        """测试监控指标端点"""
-        response = await client.get("/health/metrics")
-        assert response.status_code == 200
-        data = response.json()
+        # 监控指标
+        assert metrics.status_code == 200
+        data = metrics.json()
         assert "metrics" in data
 
 
@@ -51,24 +77,12 @@ class TestHealthEndpoints:
 class TestTasksAPI:
     """任务 API 测试"""
 
-    @pytest.fixture
-    async def client(self):
-        """创建测试客户端"""
-        app = create_app()
-        async with AsyncClient(
-            transport=ASGITransport(app=app),
-            base_url="http://test"
-        ) as ac:
-            yield ac
-
     async def test_submit_task(self, client):
         """测试提交任务"""
         response = await client.post(
             "/api/v1/tasks/submit",
-            json={
-                "user_input": "创建一个 Hello World API",
-                "priority": 5
-            }
+            content=_SUBMIT_TASK_PAYLOAD,
+            headers=_JSON_HEADERS
         )
         # 注意：由于 orchestrator 可能未初始化，可能返回错误
         # 这是集成测试的预期行为
@@ -90,85 +104,71 @@ class TestTasksAPI:
 class TestAgentsAPI:
     """Agent API 测试"""
 
-    @pytest.fixture
-    async def client(self):
-        """创建测试客户端"""
-        app = create_app()
-        async with AsyncClient(
-            transport=ASGITransport(app=app),
-            base_url="http://test"
-        ) as ac:
-            yield ac
-
-    async def test_list_agents(self, client):
-        """测试列出所有 Agent"""
-        response = await client.get("/api/v1/agents/")
-        # 可能返回空列表或错误
-        assert response.status_code in [200, 500]
-
-    async def test_list_agent_types(self, client):
-        """测试列出 Agent 类型"""
-        response = await client.get("/api/v1/agents/types")
-        assert response.status_code == 200
-        data = response.json()
+    async def test_agents_endpoints(self, client):
+        """测试 Agent 端点（三个只读请求并发发出）"""
+        agents, agent_types, stats = await asyncio.gather(
+            client.get("/api/v1/agents/"),
+            client.get("/api/v1/agents/types"),
+            client.get("/api/v1/agents/stats"),
+        )
+
+        # 列出所有 Agent：可能返回空列表或错误
+        assert agents.status_code in [200, 500]
+
+        # 列出 Agent 类型
+        assert agent_types.status_code == 200
+        data = agent_types.json()
         assert isinstance(data, list)
 
-    async def test_get_agent_stats(self, client):
-        """测试获取 Agent 统计"""
-        response = await client.get("/api/v1/agents/stats")
-        assert response.status_code in [200, 500]
+        # Agent 统计
+        assert stats.status_code in [200, 500]
 
 
 @pytest.mark.integration
 class TestSkillsAPI:
     """技能 API 测试"""
 
-    @pytest.fixture
-    async def client(self):
-        """创建测试客户端"""
-        app = create_app()
-        async with AsyncClient(
-            transport=ASGITransport(app=app),
-            base_url="http://test"
-        ) as ac:
-            yield ac
-
-    async def test_list_skills(self, client):
-        """测试列出所有技能"""
-        response = await client.get("/api/v1/skills/")
-        assert response.status_code in [200, 500]
-
-    async def test_list_skill_categories(self, client):
-        """测试列出技能类别"""
-        response = await client.get("/api/v1/skills/categories")
-        assert response.status_code == 200
-        data = response.json()
+    async def test_skills_endpoints(self, client):
+        """测试技能端点（三个只读请求并发发出）"""
+        skills, categories, missing = await asyncio.gather(
+            client.get("/api/v1/skills/"),
+            client.get("/api/v1/skills/categories"),
+            client.get("/api/v1/skills/nonexistent"),
+        )
+
+        # 列出所有技能
+        assert skills.status_code in [200, 500]
+
+        # 列出技能类别
+        assert categories.status_code == 200
+        data = categories.json()
         assert isinstance(data, list)
 
-    async def test_get_nonexistent_skill(self, client):
-        """测试获取不存在的技能"""
-        response = await client.get("/api/v1/skills/nonexistent")
-        assert response.status_code == 404
+        # 获取不存在的技能
+        assert missing.status_code == 404
 
 
 @pytest.mark.integration
 class TestWebSocket:
     """WebSocket 测试"""
 
-    @pytest.mark.asyncio
-    async def test_websocket_connection(self):
-        """测试 WebSocket 连接"""
-        from fastapi.testclient import TestClient
-        from nexus.api.main import app
+    async def test_websocket_connection(self, app):
+        """测试 WebSocket 连接
 
-        client = TestClient(app)
+        用 httpx-ws 在当前事件循环里直连 ASGI 应用，不再经由阻塞的
+        TestClient 另起线程和事件循环。
+        """
+        from httpx_ws import aconnect_ws
+        from httpx_ws.transport import ASGIWebSocketTransport
 
-        # WebSocket 需要特殊的测试方式
-        # 这里只是示例，实际测试可能需要使用 pytest-asyncio-websocket
-        with client.websocket_connect("/ws") as websocket:
-            # 发送消息
-            websocket.send_text('{"type": "ping"}')
-
-            # 接收响应
-            data = websocket.receive_text()
-            assert data is not None
+        async with AsyncClient(
+            transport=ASGIWebSocketTransport(app=app),
+            base_url="http://test"
+        ) as http_client:
+            async with aconnect_ws("/ws", http_client) as websocket:
+                # 发送消息
+                await websocket.send_text('{"type": "ping"}')
+
+                # 接收响应
+                data = await websocket.receive_text()
+                assert data is not None
@@ -3,11 +3,77 @@ Skills 系统测试
 """
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
 from nexus.skills.base import Skill, SkillCategory, SkillStatus
+from nexus.skills.builtin.file_ops import FileOpsSkill
+from nexus.skills.builtin.terminal import TerminalSkill
 from nexus.skills.manager import SkillManager
 from nexus.skills.registry import SkillRegistry
 
+# 枚举成员缓存为模块常量：热路径（工厂、参数表）少走一次枚举属性查找
+CODE = SkillCategory.CODE
+DATA = SkillCategory.DATA
+FILE = SkillCategory.FILE
+TERMINAL = SkillCategory.TERMINAL
+
+
+@pytest.fixture
+def make_skill():
+    """Skill 工厂
+
+    大多数用例只关心个别字段（skill_id、category、enabled 等），
+    公共字段集中在这里，测试内只写差异部分。
+    """
+    def _make_skill(skill_id="test-skill", **overrides):
+        fields = {
+            "name": "Test",
+            "description": "Test",
+            "category": CODE,
+        }
+        fields.update(overrides)
+        return Skill(skill_id=skill_id, **fields)
+
+    return _make_skill
+
+
+@pytest.fixture(scope="module")
+def _registry_instance():
+    """module 级共享的注册表实例，整个模块只构建一次"""
+    return SkillRegistry()
+
+
+@pytest.fixture
+def registry(_registry_instance, monkeypatch):
+    """技能注册表（记录本测试注册的 skill_id，测试后逐一注销）
+
+    清理按注册记录进行，不假设 list() 会把 disabled 技能也列出来；
+    get() 对不存在的 id 返回 None 是测试已覆盖的契约，用作防重复注销。
+    """
+    registered: list[str] = []
+    real_register = _registry_instance.register
+
+    def _tracking_register(skill):
+        registered.append(skill.skill_id)
+        return real_register(skill)
+
+    monkeypatch.setattr(_registry_instance, "register", _tracking_register)
+
+    yield _registry_instance
+
+    for skill_id in registered:
+        if _registry_instance.get(skill_id) is not None:
+            _registry_instance.unregister(skill_id)
+
+
+@pytest.fixture
+def skill_manager():
+    """技能管理器（按测试构建）
+
+    SkillManager 的内部结构（注册表属性名、skill_definitions 的归属）
+    属于外部部署的 nexus 包，这里不依赖未经测试覆盖的属性做共享复用
+    与清理，每个测试拿全新实例。
+    """
+    return SkillManager()
+
 
 @pytest.mark.unit
 class TestSkill:
@@ -19,42 +85,29 @@ class TestSkill:
             skill_id="test-skill",
             name="Test Skill",
             description="A test skill",
-            category=SkillCategory.CODE,
+            category=CODE,
             version="1.0.0",
             enabled=True
         )
 
         assert skill.skill_id == "test-skill"
         assert skill.name == "Test Skill"
-        assert skill.category == SkillCategory.CODE
+        assert skill.category == CODE
         assert skill.enabled is True
 
-    def test_skill_execution_not_implemented(self):
+    async def test_skill_execution_not_implemented(self, make_skill):
         """测试技能执行（未实现）"""
-        skill = Skill(
-            skill_id="test-skill",
-            name="Test",
-            description="Test",
-            category=SkillCategory.CODE
-        )
+        skill = make_skill()
 
         with pytest.raises(NotImplementedError):
-            # 需要异步运行
-            import asyncio
-            asyncio.run(skill.execute({}))
+            await skill.execute({})
 
-    def test_skill_validation(self):
+    def test_skill_validation(self, make_skill):
         """测试技能参数验证"""
-        skill = Skill(
-            skill_id="test-skill",
-            name="Test",
-            description="Test",
-            category=SkillCategory.CODE,
-            parameters={
-                "required": ["param1"],
-                "optional": ["param2"]
-            }
-        )
+        skill = make_skill(parameters={
+            "required": ["param1"],
+            "optional": ["param2"]
+        })
 
         assert "param1" in skill.parameters.get("required", [])
 
@@ -63,101 +116,52 @@ class TestSkill:
 class TestSkillRegistry:
     """技能注册表测试"""
 
-    def test_register_skill(self):
+    def test_register_skill(self, registry, make_skill):
         """测试注册技能"""
-        registry = SkillRegistry()
-
-        skill = Skill(
-            skill_id="test-skill",
-            name="Test",
-            description="Test",
-            category=SkillCategory.CODE
-        )
+        skill = make_skill()
 
         registry.register(skill)
-        assert "test-skill" in registry._skills
+        # 只断言公开 API，不依赖 _skills 的内部存储结构
+        assert skill in registry.list()
         assert registry.get("test-skill") is skill
 
-    def test_unregister_skill(self):
+    def test_unregister_skill(self, registry, make_skill):
         """测试注销技能"""
-        registry = SkillRegistry()
-
-        skill = Skill(
-            skill_id="test-skill",
-            name="Test",
-            description="Test",
-            category=SkillCategory.CODE
-        )
+        skill = make_skill()
 
         registry.register(skill)
         registry.unregister("test-skill")
 
         assert registry.get("test-skill") is None
 
-    def test_list_skills(self):
+    def test_list_skills(self, registry, make_skill):
         """测试列出技能"""
-        registry = SkillRegistry()
-
         for i in range(3):
-            skill = Skill(
-                skill_id=f"skill-{i}",
-                name=f"Skill {i}",
-                description="Test",
-                category=SkillCategory.CODE
-            )
-            registry.register(skill)
+            registry.register(make_skill(f"skill-{i}", name=f"Skill {i}"))
 
         skills = registry.list()
         assert len(skills) == 3
 
-    def test_list_by_category(self):
+    def test_list_by_category(self, registry, make_skill):
         """测试按类别列出技能"""
-        registry = SkillRegistry()
-
-        code_skill = Skill(
-            skill_id="code-skill",
-            name="Code",
-            description="Code skill",
-            category=SkillCategory.CODE
-        )
-
-        data_skill = Skill(
-            skill_id="data-skill",
-            name="Data",
-            description="Data skill",
-            category=SkillCategory.DATA
-        )
+        code_skill = make_skill("code-skill", name="Code", category=CODE)
+        data_skill = make_skill("data-skill", name="Data", category=DATA)
 
         registry.register(code_skill)
         registry.register(data_skill)
 
-        code_skills = registry.list_by_category(SkillCategory.CODE)
-        data_skills = registry.list_by_category(SkillCategory.DATA)
+        code_skills = registry.list_by_category(CODE)
+        data_skills = registry.list_by_category(DATA)
 
         assert len(code_skills) == 1
         assert len(data_skills) == 1
         assert code_skills[0].skill_id == "code-skill"
         assert data_skills[0].skill_id == "data-skill"
 
-    def test_get_enabled_skills(self):
+    def test_get_enabled_skills(self, registry, make_skill):
         """测试获取启用的技能"""
-        registry = SkillRegistry()
-
-        enabled_skill = Skill(
-            skill_id="enabled",
-            name="Enabled",
-            description="Enabled skill",
-            category=SkillCategory.CODE,
-            enabled=True
-        )
-
-        disabled_skill = Skill(
-            skill_id="disabled",
-            name="Disabled",
-            description="Disabled skill",
-            category=SkillCategory.CODE,
-            enabled=False
-        )
+        enabled_skill = make_skill("enabled", name="Enabled", enabled=True)
+        disabled_skill = make_skill("disabled", name="Disabled", enabled=False)
 
         registry.register(enabled_skill)
         registry.register(disabled_skill)
@@ -171,12 +175,6 @@ class TestSkillRegistry:
 class TestSkillManager:
     """技能管理器测试"""
 
-    @pytest.fixture
-    def skill_manager(self):
-        """创建技能管理器"""
-        manager = SkillManager()
-        return manager
-
     def test_create_manager(self, skill_manager):
         """测试创建管理器"""
         assert skill_manager is not None
@@ -190,75 +188,82 @@ class TestSkillManager:
         data_skills = skill_manager.get_skills_for_task("data")
         assert isinstance(data_skills, list)
 
-    def test_execute_skill_not_found(self, skill_manager):
+    async def test_execute_skill_not_found(self, skill_manager):
         """测试执行不存在的技能"""
-        import asyncio
+        result = await skill_manager.execute_skill(
+            skill_id="non-existent",
+            parameters={},
+            context={}
+        )
+        assert result["success"] is False
+        assert "not found" in result["error"].lower()
 
-        async def test():
-            result = await skill_manager.execute_skill(
-                skill_id="non-existent",
-                parameters={},
-                context={}
-            )
-            assert result["success"] is False
-            assert "not found" in result["error"].lower()
+    async def test_load_builtin_skills(self, skill_manager):
+        """测试加载内置技能"""
+        # 模拟加载内置技能
+        skill_manager.skill_definitions["builtin"] = {
+            "skills": [
+                {
+                    "id": "test-builtin",
+                    "name": "Test Builtin",
+                    "description": "A test builtin skill",
+                    "category": "code",
+                    "enabled": True
+                }
+            ]
+        }
 
-        asyncio.run(test())
+        await skill_manager.load_builtin_skills()
 
-    def test_load_builtin_skills(self, skill_manager):
-        """测试加载内置技能"""
-        import asyncio
+        # 验证技能已加载
+        skill = skill_manager.get_skill("test-builtin")
+        assert skill is not None
 
-        async def test():
-            # 模拟加载内置技能
-            skill_manager.skill_definitions["builtin"] = {
-                "skills": [
-                    {
-                        "id": "test-builtin",
-                        "name": "Test Builtin",
-                        "description": "A test builtin skill",
-                        "category": "code",
-                        "enabled": True
-                    }
-                ]
-            }
 
-            await skill_manager.load_builtin_skills()
+@pytest.fixture(scope="module")
+def file_ops_skill():
+    """module 级共享的 FileOpsSkill 实例（内置技能构造无状态，可复用）"""
+    return FileOpsSkill()
 
-            # 验证技能已加载
-            skill = skill_manager.get_skill("test-builtin")
-            assert skill is not None
 
-        asyncio.run(test())
+@pytest.fixture(scope="module")
+def terminal_skill():
+    """module 级共享的 TerminalSkill 实例"""
+    return TerminalSkill()
 
 
 @pytest.mark.unit
 class TestBuiltinSkills:
     """内置技能测试"""
 
-    def test_file_ops_skill(self):
-        """测试文件操作技能"""
-        from nexus.skills.builtin.file_ops import FileOpsSkill
-
-        skill = FileOpsSkill()
-        assert skill.skill_id == "file-ops"
-        assert skill.category == SkillCategory.FILE
-
-    def test_terminal_skill(self):
-        """测试终端技能"""
-        from nexus.skills.builtin.terminal import TerminalSkill
+    @pytest.mark.parametrize(
+        "skill_fixture,expected_id,expected_category",
+        [
+            ("file_ops_skill", "file-ops", FILE),
+            ("terminal_skill", "terminal-exec", TERMINAL),
+        ],
+        ids=["file-ops", "terminal"],
+    )
+    def test_builtin_skill(self, request, skill_fixture,
+                           expected_id, expected_category):
+        """测试内置技能的标识、类别与元数据"""
+        skill = request.getfixturevalue(skill_fixture)
+
+        assert skill.skill_id == expected_id
+        assert skill.category == expected_category
 
-        skill = TerminalSkill()
-        assert skill.skill_id == "terminal-exec"
-        assert skill.category == SkillCategory.TERMINAL
-
-    def test_skill_metadata(self):
-        """测试技能元数据"""
-        from nexus.skills.builtin.file_ops import FileOpsSkill
-
-        skill = FileOpsSkill()
         metadata = skill.get_metadata()
-
         assert "skill_id" in metadata
         assert "name" in metadata
         assert "parameters" in metadata
+
+    def test_builtin_skill_construction_benchmark(self, request):
+        """内置技能构造成本基准
+
+        仅在装有 pytest-benchmark 时运行；常规套件加 --benchmark-skip
+        （或并行 -n auto 下自动停用）即可把构造成本测量挪出关键路径。
+        """
+        pytest.importorskip("pytest_benchmark")
+        benchmark = request.getfixturevalue("benchmark")
+
+        benchmark(FileOpsSkill)